@@ -4,6 +4,8 @@ import logging
 import sqlite3
 from datetime import datetime, timedelta
 from telegram import (
+    Bot,
+    Message,
     Update,
     KeyboardButton,
     ReplyKeyboardMarkup,
@@ -19,6 +21,7 @@ from telegram.ext import (
     ContextTypes,
     filters,
 )
+from telegram.error import RetryAfter, Forbidden, BadRequest, InvalidToken, TelegramError
 from dotenv import load_dotenv
 from collections import defaultdict
 import asyncio
@@ -31,6 +34,9 @@ OWNER_ID = int(os.getenv("OWNER_ID"))
 MAX_CHANNELS = 5
 RATE_LIMIT_SECONDS = 60
 RATE_LIMIT_MAX = 10
+HELPER_BOT_TOKENS = [t.strip() for t in os.getenv("HELPER_BOT_TOKENS", "").split(",") if t.strip()]
+ADMIN_CACHE_SECONDS = 300
+HELPER_HEALTH_COOLDOWN = 60
 
 # Logging setup
 logging.basicConfig(
@@ -79,6 +85,110 @@ def check_rate_limit(user_id):
     timestamps.append(now)
     return True
 
+# Helper Bot Pool
+helper_bots = []
+bot_cooldowns = {}
+bot_admin_cache = {}
+channel_assignments = {}
+RIGHTS_ERROR_MARKERS = ("not enough rights", "administrator rights", "chat_write_forbidden", "chat_admin_required")
+
+def is_bot_available(bot):
+    return bot_cooldowns.get(bot.id, 0) <= time.time()
+
+def mark_bot_unhealthy(bot, error):
+    cooldown = error.retry_after if isinstance(error, RetryAfter) else HELPER_HEALTH_COOLDOWN
+    logger.warning(f"Bot {bot.id} unavailable, cooling down for {cooldown}s: {error}")
+    bot_cooldowns[bot.id] = time.time() + cooldown
+
+def is_text_message(message):
+    return bool(message.get("text") if isinstance(message, dict) else message.text)
+
+def is_rights_error(error):
+    message = str(error).lower()
+    return any(marker in message for marker in RIGHTS_ERROR_MARKERS)
+
+def cache_admin_status(bot_id, channel_id, is_admin):
+    bot_admin_cache[(bot_id, str(channel_id))] = (is_admin, time.time())
+
+def was_bot_admin(bot, channel_id):
+    # Last known status regardless of age, used while the bot is cooling down.
+    return bot_admin_cache.get((bot.id, str(channel_id)), (False, 0))[0]
+
+async def is_bot_admin(bot, channel_id):
+    cached = bot_admin_cache.get((bot.id, str(channel_id)))
+    if cached and time.time() - cached[1] < ADMIN_CACHE_SECONDS:
+        return cached[0]
+    # Network errors and timeouts propagate so callers retry instead of caching a wrong answer.
+    try:
+        bot_member = await bot.get_chat_member(channel_id, bot.id)
+        is_admin = bot_member.status == "administrator"
+    except (Forbidden, BadRequest) as e:
+        logger.warning(f"Bot {bot.id} cannot access {channel_id}: {e}")
+        is_admin = False
+    cache_admin_status(bot.id, channel_id, is_admin)
+    return is_admin
+
+async def is_helper_usable(bot, channel_id):
+    if not is_bot_available(bot):
+        return False
+    try:
+        return await is_bot_admin(bot, channel_id)
+    except TelegramError as e:
+        mark_bot_unhealthy(bot, e)
+        return False
+
+async def assign_helper(channel_id):
+    channel_id = str(channel_id)
+    assigned = channel_assignments.get(channel_id)
+    if assigned and await is_helper_usable(assigned, channel_id):
+        return assigned
+    channel_assignments.pop(channel_id, None)
+    load = defaultdict(int)
+    for bot in channel_assignments.values():
+        load[bot.id] += 1
+    for bot in sorted(helper_bots, key=lambda b: load[b.id]):
+        if await is_helper_usable(bot, channel_id):
+            channel_assignments[channel_id] = bot
+            return bot
+    return None
+
+async def group_by_bot(items, channel_of=lambda item: item, uses_helpers=lambda item: True):
+    groups = defaultdict(list)
+    for item in items:
+        bot = None
+        if uses_helpers(item):
+            try:
+                bot = await assign_helper(channel_of(item))
+            except Exception as e:
+                logger.warning(f"Failed to assign helper for {channel_of(item)}: {e}")
+        groups[bot.id if bot else None].append(item)
+    return list(groups.values())
+
+async def init_helper_bots(app):
+    seen_tokens = {BOT_TOKEN}
+    for token in HELPER_BOT_TOKENS:
+        if token in seen_tokens:
+            logger.warning("Skipping duplicate helper bot token")
+            continue
+        seen_tokens.add(token)
+        bot = Bot(token)
+        try:
+            await bot.initialize()
+        except Exception as e:
+            logger.error(f"Failed to initialize helper bot: {e}")
+            await bot.shutdown()
+            continue
+        helper_bots.append(bot)
+    if helper_bots:
+        logger.info(f"Helper bots: {[bot.username for bot in helper_bots]}")
+
+async def shutdown_helper_bots(app):
+    for bot in helper_bots:
+        try:
+            await bot.shutdown()
+        except Exception as e:
+            logger.error(f"Failed to shut down helper bot {bot.id}: {e}")
+
 # Database Functions
 def load_admins():
     conn = sqlite3.connect("bot_data.db")
@@ -223,6 +333,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             try:
                 chat = await context.bot.get_chat(ch_id)
                 bot_member = await context.bot.get_chat_member(ch_id, context.bot.id)
+                cache_admin_status(context.bot.id, ch_id, bot_member.status == "administrator")
                 status = "✅" if bot_member.status == "administrator" else "⚠️ (Not Admin)"
                 name = chat.title or chat.username or str(chat.id)
                 msg += f"{i+1}. {name} (`{ch_id}`) {status}\n"
@@ -336,17 +447,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         messages = context.user_data.get("pending_post", [])
         user_channels = load_user_channels()
         channels = user_channels.get(str(user_id), [])
-        for msg in messages:
-            for ch in channels:
-                try:
-                    bot_member = await context.bot.get_chat_member(ch, context.bot.id)
-                    if bot_member.status != "administrator":
-                        logger.warning(f"Bot is not admin in {ch}")
-                        continue
-                    await forward_cleaned(msg, context, ch)
-                except Exception as e:
-                    logger.error(f"Failed to post to {ch}: {e}")
-                    await update.message.reply_text(f"⚠️ Failed to post to `{ch}`: {str(e)}", parse_mode="Markdown")
+        for ch, error in await post_to_channels(messages, context, channels):
+            await update.message.reply_text(f"⚠️ Failed to post to `{ch}`: {error}", parse_mode="Markdown")
         await update.message.reply_text("✅ Posted to all valid channels.", reply_markup=ReplyKeyboardRemove())
         context.user_data.clear()
 
@@ -373,17 +475,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not selected_channels:
                 await update.message.reply_text("❌ No channels selected.")
             else:
-                for msg in messages:
-                    for ch in selected_channels:
-                        try:
-                            bot_member = await context.bot.get_chat_member(ch, context.bot.id)
-                            if bot_member.status != "administrator":
-                                logger.warning(f"Bot is not admin in {ch}")
-                                continue
-                            await forward_cleaned(msg, context, ch)
-                        except Exception as e:
-                            logger.error(f"Failed to post to {ch}: {e}")
-                            await update.message.reply_text(f"⚠️ Failed to post to `{ch}`: {str(e)}", parse_mode="Markdown")
+                for ch, error in await post_to_channels(messages, context, selected_channels):
+                    await update.message.reply_text(f"⚠️ Failed to post to `{ch}`: {error}", parse_mode="Markdown")
                 await update.message.reply_text("✅ Posted to selected channels.", reply_markup=ReplyKeyboardRemove())
             context.user_data.clear()
         else:
@@ -406,6 +499,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             try:
                 chat = await context.bot.get_chat(ch)
                 bot_member = await context.bot.get_chat_member(chat.id, context.bot.id)
+                cache_admin_status(context.bot.id, chat.id, bot_member.status == "administrator")
                 if bot_member.status != "administrator":
                     await update.message.reply_text(f"⚠️ Bot must be an admin in {ch}")
                     continue
@@ -592,6 +686,7 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             try:
                 chat = await context.bot.get_chat(ch_id)
                 bot_member = await context.bot.get_chat_member(ch_id, context.bot.id)
+                cache_admin_status(context.bot.id, ch_id, bot_member.status == "administrator")
                 status = "✅" if bot_member.status == "administrator" else "⚠️ (Not Admin)"
                 name = chat.title or chat.username or str(chat.id)
                 msg += f"{i+1}. {name} (`{ch_id}`) {status}\n"
@@ -607,34 +702,100 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             await query.edit_message_text(msg, parse_mode="Markdown")
 
-async def forward_cleaned(message_dict, context, target_chat_id):
+async def forward_cleaned(message_dict, context, target_chat_id, bot=None):
+    bot = bot or context.bot
     try:
         message = Update(0, message=message_dict).message
         if message.text:
-            await context.bot.send_message(chat_id=target_chat_id, text=message.text)
+            await bot.send_message(chat_id=target_chat_id, text=message.text)
         elif message.photo:
-            await context.bot.send_photo(chat_id=target_chat_id, photo=message.photo[-1].file_id, caption=message.caption)
+            await bot.send_photo(chat_id=target_chat_id, photo=message.photo[-1].file_id, caption=message.caption)
         elif message.video:
-            await context.bot.send_video(chat_id=target_chat_id, video=message.video.file_id, caption=message.caption)
+            await bot.send_video(chat_id=target_chat_id, video=message.video.file_id, caption=message.caption)
         elif message.document:
-            await context.bot.send_document(chat_id=target_chat_id, document=message.document.file_id, caption=message.caption)
+            await bot.send_document(chat_id=target_chat_id, document=message.document.file_id, caption=message.caption)
     except Exception as e:
         logger.error(f"Error forwarding to {target_chat_id}: {e}")
         raise
 
-async def check_scheduled_posts(context: ContextTypes.DEFAULT_TYPE):
+async def send_via_pool(message, context, channel_id):
+    # Scheduled posts are stored as dicts.
+    if isinstance(message, dict):
+        message = Message.de_json(message, context.bot)
+    # File IDs are only valid for the bot that received them, so media stays on the main bot.
+    text = is_text_message(message)
+    pool = [context.bot] + (helper_bots if text else [])
+    tried = set()
     while True:
-        now = datetime.now()
-        posts = get_scheduled_posts()
-        for post_id, user_id, channel_id, message, schedule_time in posts:
-            if now >= schedule_time:
+        bot = await assign_helper(channel_id) if text else None
+        if bot is None or bot.id in tried:
+            bot = context.bot
+            if bot.id in tried or not is_bot_available(bot) or not await is_bot_admin(bot, channel_id):
+                break
+        tried.add(bot.id)
+        try:
+            await forward_cleaned(message, context, channel_id, bot=bot)
+            return True
+        except (RetryAfter, InvalidToken) as e:
+            mark_bot_unhealthy(bot, e)
+        except Forbidden as e:
+            logger.warning(f"Bot {bot.id} lost access to {channel_id}: {e}")
+            cache_admin_status(bot.id, channel_id, False)
+        except BadRequest as e:
+            if not is_rights_error(e):
+                raise
+            logger.warning(f"Bot {bot.id} lost posting rights in {channel_id}: {e}")
+            cache_admin_status(bot.id, channel_id, False)
+    cooldowns = [bot_cooldowns[b.id] for b in pool if not is_bot_available(b) and was_bot_admin(b, channel_id)]
+    if cooldowns:
+        raise RetryAfter(int(min(cooldowns) - time.time()) + 1)
+    return False
+
+async def post_to_channels(messages, context, channels):
+    failures = []
+
+    async def post_group(msg, group):
+        for ch in group:
+            try:
+                if not await send_via_pool(msg, context, ch):
+                    logger.warning(f"No admin bot available in {ch}")
+                    failures.append((ch, "no admin bot available"))
+            except Exception as e:
+                logger.error(f"Failed to post to {ch}: {e}")
+                failures.append((ch, str(e)))
+
+    # Text goes out concurrently across helper groups; media is sent by the main bot, so it stays serial.
+    for msg in messages:
+        groups = await group_by_bot(channels) if is_text_message(msg) else [channels]
+        await asyncio.gather(*(post_group(msg, group) for group in groups))
+    return failures
+
+async def post_due_scheduled_posts(context):
+    async def post_group(group):
+        for posts in group:
+            for post_id, user_id, channel_id, message, schedule_time in posts:
                 try:
-                    bot_member = await context.bot.get_chat_member(channel_id, context.bot.id)
-                    if bot_member.status == "administrator":
-                        await forward_cleaned(message, context, channel_id)
+                    await send_via_pool(message, context, channel_id)
                     delete_scheduled_post(post_id)
                 except Exception as e:
                     logger.error(f"Failed to post scheduled message to {channel_id}: {e}")
+
+    now = datetime.now()
+    channel_posts = defaultdict(list)
+    for post in get_scheduled_posts():
+        if now >= post[4]:
+            channel_posts[post[2]].append(post)
+    # Channels with any media post stay with the main bot's group so its sends are serial.
+    groups = await group_by_bot(
+        list(channel_posts.values()),
+        channel_of=lambda posts: posts[0][2],
+        uses_helpers=lambda posts: all(is_text_message(post[3]) for post in posts),
+    )
+    await asyncio.gather(*(post_group(group) for group in groups))
+
+async def check_scheduled_posts(context: ContextTypes.DEFAULT_TYPE):
+    while True:
+        await post_due_scheduled_posts(context)
         await asyncio.sleep(60)  # Check every minute
 
 # ================= Main =================
@@ -642,7 +803,13 @@ def main():
     print(f"✅ Bot is starting... OWNER_ID: {OWNER_ID}")
     admins = load_admins()
     print(f"Current admins: {admins}")
-    app = Application.builder().token(BOT_TOKEN).build()
+    app = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .post_init(init_helper_bots)
+        .post_shutdown(shutdown_helper_bots)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CallbackQueryHandler(handle_callback))
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telegram")
+from telegram import Chat, Message, PhotoSize
+from telegram.error import BadRequest, Forbidden, InvalidToken, RetryAfter, TimedOut
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHANNEL = "-100123"
+
+
+@pytest.fixture(scope="module")
+def bot_main(tmp_path_factory):
+    os.environ.setdefault("OWNER_ID", "1")
+    os.environ.setdefault("BOT_TOKEN", "main-token")
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("bot"))
+    sys.path.insert(0, ROOT)
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+@pytest.fixture(autouse=True)
+def reset_pool(bot_main):
+    bot_main.helper_bots.clear()
+    bot_main.bot_cooldowns.clear()
+    bot_main.bot_admin_cache.clear()
+    bot_main.channel_assignments.clear()
+
+
+class StubBot:
+    def __init__(self, bot_id, admin_in=(CHANNEL,), send_error=None, member_error=None):
+        self.id = bot_id
+        self.username = f"bot{bot_id}"
+        self.admin_in = set(admin_in)
+        self.send_error = send_error
+        self.member_error = member_error
+        self.member_calls = 0
+        self.sent = []
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.member_calls += 1
+        if self.member_error:
+            raise self.member_error
+        return SimpleNamespace(status="administrator" if str(chat_id) in self.admin_in else "member")
+
+    async def send_message(self, chat_id, text):
+        if self.send_error:
+            raise self.send_error
+        self.sent.append((chat_id, text))
+
+    async def send_photo(self, chat_id, photo, caption=None):
+        if self.send_error:
+            raise self.send_error
+        self.sent.append((chat_id, photo))
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self.shut_down = True
+
+
+def text_message(text="hello"):
+    return SimpleNamespace(text=text, photo=None, video=None, document=None, caption=None)
+
+
+def real_message(text=None, photo=None):
+    chat = Chat(id=1, type=Chat.PRIVATE)
+    return Message(message_id=1, date=datetime.now(), chat=chat, text=text, photo=photo)
+
+
+def photo_message():
+    photo = SimpleNamespace(file_id="file")
+    return SimpleNamespace(text=None, photo=[photo], video=None, document=None, caption=None)
+
+
+def send(bot_main, main_bot, message, channel=CHANNEL):
+    context = SimpleNamespace(bot=main_bot)
+    return asyncio.run(bot_main.send_via_pool(message, context, channel))
+
+
+def test_text_is_routed_through_assigned_helper(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2)
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is True
+    assert helper.sent == [(CHANNEL, "hello")]
+    assert main_bot.sent == []
+    assert bot_main.channel_assignments[CHANNEL] is helper
+
+
+def test_media_stays_on_main_bot(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2)
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, photo_message()) is True
+    assert main_bot.sent == [(CHANNEL, "file")]
+    assert helper.sent == []
+
+
+def test_assign_helper_balances_channels(bot_main):
+    first, second = StubBot(2, admin_in=("a", "b")), StubBot(3, admin_in=("a", "b"))
+    bot_main.helper_bots.extend([first, second])
+    assert asyncio.run(bot_main.assign_helper("a")) is first
+    assert asyncio.run(bot_main.assign_helper("b")) is second
+
+
+def test_retry_after_fails_over_and_cools_down_helper(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2, send_error=RetryAfter(30))
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is True
+    assert main_bot.sent == [(CHANNEL, "hello")]
+    assert not bot_main.is_bot_available(helper)
+
+
+def test_forbidden_marks_helper_not_admin(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2, send_error=Forbidden("bot was kicked"))
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is True
+    assert main_bot.sent == [(CHANNEL, "hello")]
+    assert bot_main.bot_admin_cache[(2, CHANNEL)][0] is False
+
+
+def test_lost_posting_rights_fails_over(bot_main):
+    error = BadRequest("Need administrator rights in the channel chat")
+    main_bot, helper = StubBot(1), StubBot(2, send_error=error)
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is True
+    assert main_bot.sent == [(CHANNEL, "hello")]
+    assert bot_main.bot_admin_cache[(2, CHANNEL)][0] is False
+
+
+def test_other_bad_request_is_raised(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2, send_error=BadRequest("Message text is empty"))
+    bot_main.helper_bots.append(helper)
+    with pytest.raises(BadRequest):
+        send(bot_main, main_bot, text_message())
+    assert main_bot.sent == []
+
+
+def test_cooling_helper_raises_retry_after(bot_main):
+    main_bot, helper = StubBot(1, admin_in=()), StubBot(2)
+    bot_main.helper_bots.append(helper)
+    bot_main.cache_admin_status(helper.id, CHANNEL, True)
+    bot_main.bot_cooldowns[helper.id] = time.time() + 20
+    with pytest.raises(RetryAfter):
+        send(bot_main, main_bot, text_message())
+
+
+def test_cooling_main_bot_raises_retry_after(bot_main):
+    main_bot = StubBot(1, send_error=RetryAfter(30))
+    with pytest.raises(RetryAfter):
+        send(bot_main, main_bot, photo_message())
+
+
+def test_no_admin_bot_returns_false(bot_main):
+    main_bot, helper = StubBot(1, admin_in=()), StubBot(2, admin_in=())
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is False
+
+
+def test_network_error_is_not_cached(bot_main):
+    main_bot = StubBot(1, member_error=TimedOut())
+    with pytest.raises(TimedOut):
+        send(bot_main, main_bot, photo_message())
+    assert (1, CHANNEL) not in bot_main.bot_admin_cache
+
+
+def test_admin_status_is_cached(bot_main):
+    main_bot = StubBot(1)
+    send(bot_main, main_bot, photo_message())
+    send(bot_main, main_bot, photo_message())
+    assert main_bot.member_calls == 1
+
+
+def test_post_to_channels_reports_failures(bot_main):
+    main_bot, helper = StubBot(1, admin_in=("a",)), StubBot(2, admin_in=("b",))
+    bot_main.helper_bots.append(helper)
+    context = SimpleNamespace(bot=main_bot)
+    failures = asyncio.run(bot_main.post_to_channels([text_message()], context, ["a", "b", "c"]))
+    assert main_bot.sent == [("a", "hello")]
+    assert helper.sent == [("b", "hello")]
+    assert failures == [("c", "no admin bot available")]
+
+
+def test_init_helper_bots_skips_duplicate_tokens(bot_main, monkeypatch):
+    class InitBot(StubBot):
+        def __init__(self, token):
+            super().__init__(token)
+
+    monkeypatch.setattr(bot_main, "Bot", InitBot)
+    monkeypatch.setattr(bot_main, "HELPER_BOT_TOKENS", ["h1", bot_main.BOT_TOKEN, "h1", "h2"])
+    asyncio.run(bot_main.init_helper_bots(None))
+    assert [bot.id for bot in bot_main.helper_bots] == ["h1", "h2"]
+
+
+@pytest.mark.parametrize("error", [InvalidToken(), TimedOut()])
+def test_broken_helper_falls_back_to_main_bot(bot_main, error):
+    main_bot, helper = StubBot(1), StubBot(2, member_error=error)
+    bot_main.helper_bots.append(helper)
+    context = SimpleNamespace(bot=main_bot)
+    failures = asyncio.run(bot_main.post_to_channels([text_message()], context, [CHANNEL, "-100456"]))
+    assert failures == [("-100456", "no admin bot available")]
+    assert main_bot.sent == [(CHANNEL, "hello")]
+    assert not bot_main.is_bot_available(helper)
+
+
+def test_revoked_helper_token_on_send_fails_over(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2, send_error=InvalidToken())
+    bot_main.helper_bots.append(helper)
+    assert send(bot_main, main_bot, text_message()) is True
+    assert main_bot.sent == [(CHANNEL, "hello")]
+    assert not bot_main.is_bot_available(helper)
+
+
+def test_media_batch_does_not_query_helpers(bot_main):
+    main_bot, helper = StubBot(1, admin_in=("a", "b")), StubBot(2, admin_in=("a", "b"))
+    bot_main.helper_bots.append(helper)
+    context = SimpleNamespace(bot=main_bot)
+    asyncio.run(bot_main.post_to_channels([photo_message()], context, ["a", "b"]))
+    assert main_bot.sent == [("a", "file"), ("b", "file")]
+    assert helper.member_calls == 0
+    assert bot_main.channel_assignments == {}
+
+
+def test_real_message_is_posted(bot_main):
+    main_bot, helper = StubBot(1), StubBot(2)
+    bot_main.helper_bots.append(helper)
+    context = SimpleNamespace(bot=main_bot)
+    photo = [PhotoSize(file_id="small", file_unique_id="s", width=1, height=1),
+             PhotoSize(file_id="large", file_unique_id="l", width=9, height=9)]
+    messages = [real_message(text="hello"), real_message(photo=photo)]
+    assert asyncio.run(bot_main.post_to_channels(messages, context, [CHANNEL])) == []
+    assert helper.sent == [(CHANNEL, "hello")]
+    assert main_bot.sent == [(CHANNEL, "large")]
+
+
+def test_scheduled_dict_payload_is_posted(bot_main, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bot_main.init_db()
+    main_bot, helper = StubBot(1), StubBot(2)
+    bot_main.helper_bots.append(helper)
+    due = datetime.now() - timedelta(minutes=1)
+    bot_main.schedule_post("1", CHANNEL, real_message(text="later").to_dict(), due)
+    bot_main.schedule_post("1", CHANNEL, real_message(text="future").to_dict(), due + timedelta(hours=1))
+    asyncio.run(bot_main.post_due_scheduled_posts(SimpleNamespace(bot=main_bot)))
+    assert helper.sent == [(CHANNEL, "later")]
+    assert [post[3]["text"] for post in bot_main.get_scheduled_posts()] == ["future"]
+
+
+def test_helper_clients_are_shut_down(bot_main, monkeypatch):
+    created = []
+
+    class FailingBot(StubBot):
+        def __init__(self, token):
+            super().__init__(token)
+            created.append(self)
+
+        async def initialize(self):
+            raise InvalidToken()
+
+    monkeypatch.setattr(bot_main, "Bot", FailingBot)
+    monkeypatch.setattr(bot_main, "HELPER_BOT_TOKENS", ["bad"])
+    asyncio.run(bot_main.init_helper_bots(None))
+    assert bot_main.helper_bots == []
+    assert created[0].shut_down
+
+
+def test_shutdown_continues_after_error(bot_main):
+    class BrokenBot(StubBot):
+        async def shutdown(self):
+            raise TimedOut()
+
+    healthy = StubBot(3)
+    bot_main.helper_bots.extend([BrokenBot(2), healthy])
+    asyncio.run(bot_main.shutdown_helper_bots(None))
+    assert healthy.shut_down